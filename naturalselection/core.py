@@ -1,7 +1,8 @@
 import numpy as np
 import sys
 import os
-from functools import reduce, partial
+from functools import partial
+from collections import OrderedDict
 import logging
 
 # Suppressing warnings
@@ -17,6 +18,21 @@ from tqdm import tqdm, trange
 from inspect import getfullargspec
 import multiprocessing as mp
 
+# Duck typing function to make things immutable
+def make_immutable(x):
+    try:
+        if not isinstance(x, str):
+            x = tuple(x)
+    except TypeError:
+        pass
+    return x
+
+# Columns of hashable scalars can be converted in a single call
+def immutable_column(col):
+    if col.ndim == 1 and col.dtype != object:
+        return col.tolist()
+    return [make_immutable(val) for val in col]
+
 class Genus():
     ''' Storing information about all the possible gene combinations.
 
@@ -24,23 +40,148 @@ class Genus():
         (kwargs) genomes
     '''
 
+    # The genes are stored in __dict__, so the generator of the genus is
+    # kept in a slot to leave every gene name free
+    __slots__ = ('__dict__', '_rng')
+
     def __init__(self, **genomes):
         self.__dict__.update(
             {key: np.asarray(val) for (key, val) in genomes.items()}
             )
 
-    def create_organism(self):
-        rnd_genes = {key: val[np.random.choice(range(val.shape[0]))]
-            for (key, val) in self.__dict__.items()}
-        return Organism(genus = self, **rnd_genes)
+    @property
+    def rng(self):
+        ''' Random number generator of the genus, used whenever no other
+            generator is given. '''
+        try:
+            return self._rng
+        except AttributeError:
+            self._rng = np.random.default_rng()
+            return self._rng
+
+    def get_genomes(self):
+        ''' Get the possible values of all the genes of the genus. '''
+        return dict(self.__dict__)
 
-    def create_organisms(self, amount = 1):
+    def create_organism(self, rng = None):
+        rng = self.rng if rng is None else rng
+        rnd_genes = {key: val[rng.integers(val.shape[0])]
+            for (key, val) in self.get_genomes().items()}
+        return Organism.from_genome(self, rnd_genes)
+
+    def create_organisms(self, amount = 1, rng = None):
         ''' Create organisms of this genus.
         
         INPUT
             (int) amount = 1
+            (Generator) rng = None: random number generator to use
+        '''
+        genes = self.create_genes(amount, rng = rng)
+        organisms = np.empty(amount, dtype = object)
+        for i in range(amount):
+            genome = {key: col[i] for (key, col) in genes.items()}
+            organisms[i] = Organism.from_genome(self, genome)
+        return organisms
+
+    def create_genes(self, amount = 1, rng = None):
+        ''' Create random genes of this genus, stored as one array per
+            gene with a row for every organism.
+
+        INPUT
+            (int) amount = 1
+            (Generator) rng = None: random number generator to use
+
+        OUTPUT
+            (dict) genes, with arrays of length amount as values
+        '''
+        rng = self.rng if rng is None else rng
+        return {key: val[rng.integers(val.shape[0], size = amount)]
+            for (key, val) in self.get_genomes().items()}
+
+    def breed_genes(self, fst, snd, rng = None):
+        ''' Breed pairs of genes of this genus using single-point
+            crossover, drawing all the crossover points at once.
+
+        INPUT
+            (dict) fst: genes of the first parents, one array per gene
+            (dict) snd: genes of the second parents, one array per gene
+            (Generator) rng = None: random number generator to use
+
+        OUTPUT
+            (dict) genes of the children, one array per gene
+        '''
+
+        rng = self.rng if rng is None else rng
+        keys = list(self.get_genomes().keys())
+        amount = len(fst[keys[0]])
+        crossovers = rng.integers(len(keys), size = amount)
+
+        # The children inherit the genes before the crossover point from
+        # the first parent and the remaining genes from the second parent
+        children = {}
+        for (key_idx, key) in enumerate(keys):
+            mask = np.less(key_idx, crossovers)
+            mask = mask.reshape(mask.shape + (1,) * (fst[key].ndim - 1))
+            children[key] = np.where(mask, fst[key], snd[key])
+        return children
+
+    def breed_organisms(self, parents, rng = None):
+        ''' Breed pairs of organisms of this genus using single-point
+            crossover, drawing all the crossover points at once.
+
+        INPUT
+            (ndarray) parents: array of shape (amount, 2) with organisms
+            (Generator) rng = None: random number generator to use
+
+        OUTPUT
+            (ndarray) children, one for every pair of parents
         '''
-        return np.array([self.create_organism() for _ in range(amount)])
+
+        if any(org.genus != self for org in parents.flat):
+            raise Exception("Only organisms of the same genus can breed.")
+
+        keys = self.get_genomes().keys()
+        fst = {key: np.array([org.__dict__[key] for org in parents[:, 0]],
+            dtype = object) for key in keys}
+        snd = {key: np.array([org.__dict__[key] for org in parents[:, 1]],
+            dtype = object) for key in keys}
+        genes = self.breed_genes(fst, snd, rng = rng)
+
+        children = np.empty(parents.shape[0], dtype = object)
+        for i in range(parents.shape[0]):
+            genome = {key: col[i] for (key, col) in genes.items()}
+            children[i] = Organism.from_genome(self, genome)
+        return children
+
+    def mutate_genes(self, genes, mutation_factor = 'default', rng = None):
+        ''' Mutate genes of this genus in place.
+
+        INPUT
+            (dict) genes: one array per gene
+            (float or string) mutation_factor = 'default': the probability
+                              that a given gene is changed. Defaults to
+                              1/k, where k is the number of genes
+            (Generator) rng = None: random number generator to use
+
+        OUTPUT
+            (dict) the mutated genes
+        '''
+        rng = self.rng if rng is None else rng
+        genus_genes = self.get_genomes()
+        if mutation_factor == 'default':
+            mutation_factor = np.divide(1, len(genus_genes))
+
+        # Decide which genes to mutate for all the keys at once
+        amount = len(next(iter(genes.values()), ()))
+        mut_idxs = np.less(rng.random((len(genus_genes), amount)),
+            mutation_factor)
+
+        for ((key, val), mut_idx) in zip(genus_genes.items(), mut_idxs):
+            mut_amt = np.count_nonzero(mut_idx)
+            if mut_amt:
+                genes[key][mut_idx] = val[rng.integers(val.shape[0],
+                    size = mut_amt)]
+        return genes
 
     def alter_genomes(self, **genomes):
         ''' Add or change genomes to the genus.
@@ -62,48 +203,61 @@ class Organism():
 
     INPUT
         (Genus) genus
+        (Generator) rng = None: random number generator used to fill in
+                    missing genes, defaulting to the one of the genus
         (kwargs) genome: genome information
     '''
 
-    def __init__(self, genus, **genome):
+    def __init__(self, genus, rng = None, **genome):
 
         # Check that the input parameters match with the genus type,
         # and if any parameters are missing then add random values
+        rng = genus.rng if rng is None else rng
+        genus_genes = genus.get_genomes()
         genome = {key: val for (key, val) in genome.items() if key in
-            genus.__dict__.keys() and val in genus.__dict__[key]}
-        for key in genus.__dict__.keys() - genome.keys():
-            val_idx = np.random.choice(range(genus.__dict__[key].shape[0]))
-            genome[key] = genus.__dict__[key][val_idx]
+            genus_genes.keys() and val in genus_genes[key]}
+        for (key, val) in genus_genes.items():
+            if key not in genome:
+                genome[key] = val[rng.integers(val.shape[0])]
 
         self.__dict__.update(genome)
         self.genus = genus
         self.fitness = 0
 
+    @classmethod
+    def from_genome(cls, genus, genome, fitness = 0):
+        ''' Create an organism from a complete genome of the genus,
+            skipping the checks done when initialising an organism.
+
+        INPUT
+            (Genus) genus
+            (dict) genome: values for all the genes of the genus
+            (float) fitness = 0
+        '''
+        org = cls.__new__(cls)
+        org.__dict__.update(genome)
+        org.genus = genus
+        org.fitness = fitness
+        return org
+
     def get_genome(self):
         return {key: val for (key, val) in self.__dict__.items()
                           if key not in {'genus', 'fitness'}}
 
-    def breed(self, other):
+    def breed(self, other, rng = None):
         ''' Breed organism with another organism, returning a new
             organism of the same genus.
 
         INPUT
             (Organism) other organism
+            (Generator) rng = None: random number generator to use
         '''
 
-        if self.genus != other.genus:
-            raise Exception("Only organisms of the same genus can breed.")
-
-        self_genome = list(self.get_genome().items())
-        other_genome = list(other.get_genome().items())
+        parents = np.empty((1, 2), dtype = object)
+        parents[0, :] = [self, other]
+        return self.genus.breed_organisms(parents, rng = rng)[0]
 
-        rnd = np.random.choice(len(self_genome))
-        child_genome = dict(self_genome[:rnd] + other_genome[rnd:])
-        child = Organism(self.genus, **child_genome)
-
-        return child
-
-    def mutate(self, mutation_factor = 'default'):
+    def mutate(self, mutation_factor = 'default', rng = None):
         ''' Return mutated version of the organism.
         
         INPUT
@@ -111,15 +265,16 @@ class Organism():
                               organism is being mutated, the probability that
                               a given gene is changed. Defaults to 1/k, where
                               k is the size of the population
+            (Generator) rng = None: random number generator to use
         '''
-        keys = np.asarray(list(self.get_genome().keys()))
+        rng = self.genus.rng if rng is None else rng
+        genus_genes = self.genus.get_genomes()
         if mutation_factor == 'default':
-            mutation_factor = np.divide(1, keys.size)
-        mut_idx = np.less(np.random.random(keys.size), mutation_factor)
-        mut_vals = {key: self.genus.__dict__[key]\
-            [np.random.choice(range(self.genus.__dict__[key].shape[0]))]
-            for key in keys[mut_idx]}
-        self.__dict__.update(mut_vals)
+            mutation_factor = np.divide(1, len(genus_genes))
+        mut_idx = np.less(rng.random(len(genus_genes)), mutation_factor)
+        for ((key, val), mutate) in zip(genus_genes.items(), mut_idx):
+            if mutate:
+                self.__dict__[key] = val[rng.integers(val.shape[0])]
         return self
 
 class Population():
@@ -140,6 +295,11 @@ class Population():
                           k is the size of the population
         (float) elitism rate = 0.05: percentage of population to keep
                 across generations
+        (bool) vectorized_fitness = False: whether fitness_fn takes an
+               array of organisms and returns an array of their fitness
+               values, in which case it is called once per generation
+               with the organisms with unique genomes whose fitness
+               values are not cached
         (bool) multiprocessing = False: whether fitnesses should be
                computed in parallel
         (int) workers = mp.cpu_count(): how many workers to use if
@@ -150,16 +310,22 @@ class Population():
         (int or string) memory = 'inf': how many generations the
                         population can look back to avoid redundant
                         fitness computations, where 'inf' means unlimited
-                        memory.
+                        memory. The fitness values of up to memory * size
+                        genomes are cached, discarding the least recently
+                        used ones first
         (bool) allow_repeats = True: allow computing duplicate fitness vals
+        (bool) keep_genome_history = False: whether the history returned by
+               evolve should store the genomes of every generation
+        (int) seed = None: seed for the random number generator
         (int) verbose = 0: verbosity mode
         '''
 
     def __init__(self, genus, size, fitness_fn, initial_genome = None,
         breeding_rate = 0.8, mutation_rate = 0.2, mutation_factor = 'default', 
-        elitism_rate = 0.05, multiprocessing = False, workers = mp.cpu_count(),
-        progress_bars = 1, memory = 'inf', allow_repeats = True,
-        verbose = 0):
+        elitism_rate = 0.05, vectorized_fitness = False,
+        multiprocessing = False, workers = mp.cpu_count(), progress_bars = 1,
+        memory = 'inf', allow_repeats = True, keep_genome_history = False,
+        seed = None, verbose = 0):
 
         self.genus = genus
         self.size = size
@@ -168,12 +334,16 @@ class Population():
         self.mutation_rate = mutation_rate
         self.mutation_factor = mutation_factor
         self.elitism_rate = elitism_rate
+        self.vectorized_fitness = vectorized_fitness
         self.multiprocessing = multiprocessing
         self.workers = workers
         self.progress_bars = progress_bars
         self.memory = memory
         self.allow_repeats = allow_repeats
+        self.keep_genome_history = keep_genome_history
         self.verbose = verbose
+        self.rng = np.random.default_rng(seed)
+        self.processes = []
 
         if 'worker_idx' not in getfullargspec(fitness_fn).args:
             def new_fitness_fn(*args, worker_idx = None, **kwargs):
@@ -193,82 +363,173 @@ class Population():
             self.logger.setLevel(logging.DEBUG)
 
         self.logger.info("Creating population...")
+        self.populate(initial_genome)
+
+    @property
+    def population(self):
+        ''' Snapshot of the organisms in the population. The organisms are
+            copies built from Population.genes, so changing them does not
+            change the population. '''
+        return np.array([self.get_organism(idx) for idx in range(self.size)])
+
+    def populate(self, initial_genome = None):
+        ''' Create the genes of the population, which are stored as one
+            array per gene with a row for every organism.
+
+        INPUT
+            (dict) initial_genome = None: start with a population similar to
+                   the genome, for a warm start
+        '''
 
         if initial_genome:
 
             # Create a population of identical organisms
-            self.population = np.array(
-                [Organism(genus, **initial_genome) for _ in range(size)])
+            org = Organism(self.genus, rng = self.rng, **initial_genome)
+            self.genes = {}
+            for (key, val) in self.genus.get_genomes().items():
+                self.genes[key] = np.empty((self.size,) + val.shape[1:],
+                    dtype = val.dtype)
+                self.genes[key][:] = org.__dict__[key]
 
             # Mutate 80% of the population
-            rnd = np.random.random(self.population.shape)
-            for (i, org) in enumerate(self.population):
-                if rnd[i] > 0.2:
-                    org.mutate()
+            self.mutate(np.greater(self.rng.random(self.size), 0.2))
         else:
-            self.population = genus.create_organisms(size)
+            self.genes = self.genus.create_genes(self.size, rng = self.rng)
 
-        self.fittest = np.random.choice(self.population)
+        self.fitnesses = np.zeros(self.size)
+        self.fitness_cache = OrderedDict()
 
-    def get_genomes(self):
-        return np.asarray([org.get_genome() for org in self.population])
+        # We do not have access to fitness values yet, so choose the 'fittest
+        # organism' to just be a random one
+        self.fittest = self.get_organism(self.rng.integers(self.size))
+
+        return self
+
+    def get_organism(self, idx):
+        ''' Get the organism stored at a given row of the population. '''
+        genome = {key: col[idx] for (key, col) in self.genes.items()}
+        return Organism.from_genome(self.genus, genome,
+            fitness = self.fitnesses[idx])
+
+    def get_genomes(self, indices = None):
+        if indices is None:
+            indices = range(self.size)
+        return np.asarray([{key: col[idx] for (key, col) in self.genes.items()}
+            for idx in indices])
 
     def get_fitnesses(self):
-        return np.asarray([org.fitness for org in self.population])
+        return self.fitnesses
+
+    def mutate(self, mutators, mutation_factor = 'default'):
+        ''' Mutate a subset of the population.
+
+        INPUT
+            (ndarray) mutators: boolean mask or indices of the organisms
+                      to mutate
+            (float or string) mutation_factor = 'default': given that an
+                              organism is being mutated, the probability that
+                              a given gene is changed. Defaults to 1/k, where
+                              k is the number of genes
+        '''
+        genes = {key: col[mutators] for (key, col) in self.genes.items()}
+        genes = self.genus.mutate_genes(genes, mutation_factor,
+            rng = self.rng)
+        for (key, col) in genes.items():
+            self.genes[key][mutators] = col
+        return self
+
+    def start_workers(self):
+        ''' Start the processes computing fitness values in parallel,
+            unless they are running already. The processes are reused
+            until close_workers is called. Workers started by evolve are
+            kept alive across its generations and closed when it
+            finishes, while workers started by a direct call to
+            update_fitness are closed at the end of that call. '''
+
+        if self.processes:
+            return self
+
+        # Define queues to organise the parallelising
+        self.todo = mp.Queue()
+        self.done = mp.Queue()
+
+        def worker(todo, done):
+            ''' Fitness computing worker. '''
+            worker_idx = mp.current_process()._identity[0]
+
+            # Forked workers inherit the random state, so reseed them to
+            # avoid correlated fitness values
+            np.random.seed()
+
+            while True:
+                chunk = todo.get()
+                if chunk is None:
+                    break
+                done.put([(idx, self.fitness_fn(
+                    Organism.from_genome(self.genus, genome),
+                    worker_idx = worker_idx))
+                    for (idx, genome) in chunk])
+
+        # Define our processes
+        self.processes = [mp.Process(target = worker,
+            args = (self.todo, self.done)) for _ in range(self.workers)]
+
+        # Daemonise the processes, meaning they close when the main
+        # process finishes, and start them
+        for p in self.processes:
+            p.daemon = True
+            p.start()
+
+        return self
+
+    def close_workers(self):
+        ''' Stop and join up the fitness computing processes. Work left in
+            the queues, for instance after an interrupted evolution, is
+            discarded along with the queues, so that start_workers begins
+            with empty ones. '''
+
+        if not self.processes:
+            return self
+
+        for p in self.processes:
+            p.terminate()
+        for p in self.processes:
+            p.join()
+
+        # Drop the queues without waiting for unread items to be flushed
+        for queue in (self.todo, self.done):
+            queue.cancel_join_thread()
+            queue.close()
+        self.todo = None
+        self.done = None
+        self.processes = []
+        return self
 
     def update_fitness(self, history = None):
         ''' Compute and update fitness values of the population.
 
         INPUT
-            (History) history = None: previous population history
+            (History) history = None: ignored, kept for compatibility, as
+                      previous fitness values are now looked up in the
+                      fitness cache of the population
         '''
 
-        # Duck typing function to make things immutable
-        def make_immutable(x):
-            try:
-                if not isinstance(x, str):
-                    x = tuple(x)
-            except TypeError:
-                pass
-            return x
-
-        def immute_dict(d):
-            return {key: make_immutable(val) for (key, val) in d.items()}
-
-        unique_genomes = np.array(
-            [dict(gene) for gene in set(frozenset(immute_dict(genome).items())
-            for genome in self.get_genomes())]
-            )
+        imm_genomes = list(zip(*map(immutable_column, self.genes.values())))
 
-        # If history is loaded then get the genomes from the current
-        # population that are unique across all generations
-        past_indices = np.array([])
-        if history and not self.allow_repeats:
-            g_prev = history.genome_history
-            f_prev = history.fitness_history
-
-            indices = np.array([((np.where(g_prev == org.get_genome())[0][0],
-                np.where(g_prev == org.get_genome())[1][0]), idx)
-                for (idx, org) in enumerate(self.population)
-                if org.get_genome() in g_prev
-                ])
-            past_indices = np.array([idx for (_, idx) in indices])
-
-            # Load previous fitnesses of genomes that are occuring now
-            for (past_idx, idx) in indices:
-                self.population[idx].fitness = f_prev[past_idx[0], past_idx[1]]
-
-            # Remove genomes that have occured previously
-            unique_genomes = np.array([genome for genome in unique_genomes
-                if genome not in g_prev])
-
-        # Pull out the organisms with the unique genomes
-        imm_genomes = np.array(list(
-            map(immute_dict, self.get_genomes())))
-        imm_unique_genomes = np.array(list(
-            map(immute_dict, unique_genomes)))
-        unique_indices = np.array([np.argmin(imm_genomes != genome) 
-            for genome in imm_unique_genomes])
+        # Use the cached fitness values of genomes that occured previously,
+        # unless we allow computing repeated fitness values
+        if self.allow_repeats:
+            past_fitnesses = {}
+        else:
+            past_fitnesses = self.fitness_cache
+
+        # Pull out the first organisms with the unique genomes that have
+        # not occured previously
+        first_indices = {}
+        for (idx, imm_genome) in enumerate(imm_genomes):
+            if imm_genome not in past_fitnesses:
+                first_indices.setdefault(imm_genome, idx)
+        unique_indices = np.array(list(first_indices.values()), dtype = int)
 
         # Compute fitness values if there are any that needs to be computed
         if unique_indices.size:
@@ -279,82 +540,87 @@ class Population():
                           '0.0 due to no predicted samples.'
                 warnings.filterwarnings('ignore', message = f1_warn)
 
-                if self.multiprocessing:
-
-                    # Define queues to organise the parallelising
-                    todo = mp.Queue(unique_indices.size + self.workers)
-                    done = mp.Queue(unique_indices.size)
-                    for idx in unique_indices:
-                        todo.put(idx)
-                    for _ in range(self.workers):
-                        todo.put(-1)
-
-                    def worker(todo, done):
-                        ''' Fitness computing worker. '''
-                        from queue import Empty
-                        while True:
-                            try:
-                                idx = todo.get(timeout = 1)
-                            except Empty:
-                                continue
-                            if idx == -1:
-                                break
-                            else:
-                                org = self.population[idx]
-                                worker_idx = mp.current_process()._identity[0]
-                                fitness = self.fitness_fn(org,
-                                    worker_idx = worker_idx)
-                                done.put((idx, fitness))
-
-                    # Define our processes
-                    processes = [mp.Process(target = worker,
-                        args = (todo, done)) for _ in range(self.workers)]
-
-                    # Daemonise the processes, meaning they close when they
-                    # they finish, and start them
-                    for p in processes:
-                        p.daemon = True
-                        p.start()
-
-                    # This is the iterable with (idx, fitness) values
-                    idx_fits = (done.get() for _ in unique_indices)
-
-                else:
-                    # This is the iterable with (idx, fitness) values,
-                    # obtained without any parallelising
-                    idx_fits = self.population[unique_indices]
-                    idx_fits = map(self.fitness_fn, idx_fits)
-                    idx_fits = zip(unique_indices, idx_fits)
-        
-                # Set up a progress bar
-                if self.progress_bars >= 2:
-                    idx_fits = tqdm(idx_fits, total = unique_indices.size)
-                    idx_fits.set_description("Computing fitness")
-
-                # Compute the fitness values
-                for (idx, new_fitness) in idx_fits:
-                    self.population[idx].fitness = new_fitness
-
-                # Join up the processes
-                if self.multiprocessing:
-                    for p in processes:
-                        p.join()
-               
-                # Close the progress bar 
-                if self.progress_bars >= 2:
-                    idx_fits.close()
-
+                # Workers started by this call are closed again below, even
+                # if computing the fitness values fails
+                own_workers = False
+                try:
+                    if self.vectorized_fitness:
+
+                        # This is the iterable with (idx, fitness) values,
+                        # obtained by a single call to the fitness function
+                        orgs = np.array(list(map(self.get_organism,
+                            unique_indices)))
+                        fits = np.asarray(self.fitness_fn(orgs))
+                        if fits.shape != unique_indices.shape:
+                            raise ValueError("The vectorized fitness "\
+                                "function returned {} values for {} "\
+                                "organisms.".format(fits.size,
+                                unique_indices.size))
+                        idx_fits = zip(unique_indices, fits)
+
+                    elif self.multiprocessing:
+
+                        # Split the indices into chunks, to cut down on the
+                        # number of round trips through the queues
+                        chunksize = max(1,
+                            unique_indices.size // (self.workers * 4))
+                        chunks = [unique_indices[i:i + chunksize] for i in
+                            range(0, unique_indices.size, chunksize)]
+
+                        # Send the genomes to the workers, which are kept
+                        # alive across generations if they were started by
+                        # evolve
+                        own_workers = not self.processes
+                        self.start_workers()
+                        for chunk in chunks:
+                            self.todo.put(list(zip(chunk,
+                                self.get_genomes(chunk))))
+
+                        # This is the iterable with (idx, fitness) values
+                        idx_fits = (idx_fit for _ in chunks
+                            for idx_fit in self.done.get())
+
+                    else:
+                        # This is the iterable with (idx, fitness) values,
+                        # obtained without any parallelising
+                        idx_fits = map(self.get_organism, unique_indices)
+                        idx_fits = map(self.fitness_fn, idx_fits)
+                        idx_fits = zip(unique_indices, idx_fits)
+
+                    # Set up a progress bar
+                    if self.progress_bars >= 2:
+                        idx_fits = tqdm(idx_fits,
+                            total = unique_indices.size)
+                        idx_fits.set_description("Computing fitness")
+
+                    # Compute the fitness values
+                    for (idx, new_fitness) in idx_fits:
+                        self.fitnesses[idx] = new_fitness
+
+                    # Close the progress bar
+                    if self.progress_bars >= 2:
+                        idx_fits.close()
+
+                finally:
+                    if own_workers:
+                        self.close_workers()
 
         # Copy out the fitness values to the other organisms with same genome
-        for (i, org) in enumerate(self.population):
-            if i not in unique_indices and i not in past_indices:
-                prev_unique_idx = np.min(np.array(
-                    [idx for idx in unique_indices
-                         if immute_dict(org.get_genome()) == \
-                         immute_dict(self.population[idx].get_genome())]
-                    ))
-                self.population[i].fitness = \
-                    self.population[prev_unique_idx].fitness
+        for (idx, imm_genome) in enumerate(imm_genomes):
+            if imm_genome in past_fitnesses:
+                self.fitnesses[idx] = past_fitnesses[imm_genome]
+                past_fitnesses.move_to_end(imm_genome)
+            else:
+                self.fitnesses[idx] = self.fitnesses[first_indices[imm_genome]]
+
+        # Store the new fitness values in the cache, discarding the least
+        # recently used ones if the cache exceeds the memory
+        if not self.allow_repeats:
+            for (imm_genome, idx) in first_indices.items():
+                self.fitness_cache[imm_genome] = self.fitnesses[idx]
+            if self.memory != 'inf':
+                while len(self.fitness_cache) > self.memory * self.size:
+                    self.fitness_cache.popitem(last = False)
 
     def sample(self, amount = 1):
         ''' Sample a fixed amount of organisms from the population,
@@ -367,34 +633,31 @@ class Population():
         OUTPUT
             (ndarray) sample of population
         '''
+        return np.array([self.get_organism(idx)
+            for idx in self._sample_indices(amount)])
+
+    def _sample_indices(self, amount = 1):
+        ''' Same as sample, but returning the indices of the sampled
+            organisms rather than the organisms themselves. '''
 
         # Convert fitness values into probabilities
         fitnesses = self.get_fitnesses()
-        probs = np.divide(fitnesses, sum(fitnesses))
+        probs = np.divide(fitnesses, fitnesses.sum())
         
-        # Copy the population to a new variable
-        pop = self.population
+        # Get evenly spaced pointers between 0 and 1 with a single random
+        # offset, as in stochastic universal sampling
+        start = self.rng.random() / amount
+        pointers = start + np.arange(amount) / amount
 
-        # Sort the probabilities in descending order and sort pop (not
-        # the actual population) in the same way
-        sorted_idx = np.argsort(probs)[::-1]
-        probs = probs[sorted_idx]
-        pop = pop[sorted_idx]
+        # Find the indices of the fitness values whose accumulated
+        # sums exceed the values of the pointers, using a binary
+        # search on the cumulative probabilities
+        cum_probs = np.cumsum(probs)
+        indices = np.searchsorted(cum_probs, pointers, side = 'right')
+        indices = np.minimum(indices, self.size - 1)
 
-        # Get random numbers between 0 and 1 
-        indices = np.random.random(amount)
-
-        for i in range(amount):
-            # Find the index of the fitness value whose accumulated
-            # sum exceeds the value of the i'th random number.
-            fn = lambda x, y: (x[0], x[1] + y[1]) \
-                              if x[1] + y[1] > indices[i] \
-                              else (x[0] + y[0], x[1] + y[1])
-            (idx, _) = reduce(fn, map(lambda x: (1, x), probs))
-            indices[i] = idx - 1
-        
-        # Return the organisms indexed at the indices found above
-        return pop[indices.astype(int)]
+        # Return the indices of the organisms found above
+        return indices
 
     def evolve(self, generations = 1, goal = None):
         ''' Evolve the population.
@@ -407,7 +670,8 @@ class Population():
         history = History(
             population = self,
             generations = generations,
-            memory = self.memory
+            memory = self.memory,
+            keep_genome_history = self.keep_genome_history
             )
 
         if self.progress_bars:
@@ -416,17 +680,36 @@ class Population():
         else:
             gen_iter = range(generations)
 
+        # Start the fitness computing processes, which are reused across
+        # the generations, and stop them again when the evolution ends or
+        # is interrupted
+        try:
+            if self.multiprocessing and not self.vectorized_fitness:
+                self.start_workers()
+            self._evolve_generations(gen_iter, history, goal)
+        finally:
+            if self.progress_bars:
+                gen_iter.close()
+            self.close_workers()
+
+        if self.progress_bars >= 2:
+            print("")
+
+        return history
+
+    def _evolve_generations(self, gen_iter, history, goal = None):
+        ''' Run the generations of evolve, adding them to the history. '''
+
         for gen in gen_iter:
 
             if goal and self.fittest.fitness >= goal:
-                # Close tqdm iterator
-                if self.progress_bars:
-                    gen_iter.close()
-            
+
                 # Truncate history for plotting
                 history.generations = gen
                 history.fitness_history = history.fitness_history[:gen, :]
-                history.genome_history = history.genome_history[:gen, :]
+                if history.genome_history is not None:
+                    history.genome_history = {key: val[:gen]
+                        for (key, val) in history.genome_history.items()}
                 if history.memory == 'inf' or history.memory > gen:
                     history.memory = gen
 
@@ -434,14 +717,15 @@ class Population():
                 break
 
             # Compute and update fitness values
-            self.update_fitness(history = history)
+            self.update_fitness()
             fitnesses = self.get_fitnesses()
             
             self.logger.debug('Updating fitness values...')
 
             # Update the fittest organism
-            if max(fitnesses) > self.fittest.fitness:
-                self.fittest = self.population[np.argmax(fitnesses)]
+            fittest_idx = np.argmax(fitnesses)
+            if fitnesses[fittest_idx] > self.fittest.fitness:
+                self.fittest = self.get_organism(fittest_idx)
 
             # Store current population in history
             history.add_entry(self, generation = gen)
@@ -452,51 +736,62 @@ class Population():
             # Select elites 
             elites_amt = np.ceil(self.size * self.elitism_rate).astype(int)
             if self.elitism_rate:
-                elites = self.sample(amount = elites_amt)
+                elites = np.argpartition(fitnesses, -elites_amt)[-elites_amt:]
 
                 self.logger.debug("Elite pool, of size {}:"\
                     .format(elites_amt))
-                self.logger.debug(np.array([org.get_genome()
-                    for org in elites]))
+                self.logger.debug(self.get_genomes(elites))
 
             # Select breeders
             breeders_amt = max(2, np.ceil(self.size * self.breeding_rate)\
                 .astype(int))
-            breeders = self.sample(amount = breeders_amt)
+            breeders = self._sample_indices(amount = breeders_amt)
 
             self.logger.debug("Breeding pool, of size {}:"\
                 .format(breeders_amt))
-            self.logger.debug(np.array([org.get_genome() for org in breeders]))
+            self.logger.debug(self.get_genomes(breeders))
             self.logger.debug("Breeding...")
 
             # Breed until we reach the same size
             children_amt = self.size - elites_amt
-            parents = np.random.choice(breeders, (self.size, 2))
-            children = np.array([parents[i, 0].breed(parents[i, 1])
-                for i in range(children_amt)])
+            parents = breeders[self.rng.integers(breeders.size,
+                size = (children_amt, 2))]
+            children = self.genus.breed_genes(
+                {key: col[parents[:, 0]] for (key, col) in self.genes.items()},
+                {key: col[parents[:, 1]] for (key, col) in self.genes.items()},
+                rng = self.rng
+                )
 
-            # Select mutators
-            mutators = np.less(np.random.random(children_amt), 
-                self.mutation_rate)
+            # Preallocate the new generation, with the elites at the end
+            new_genes = {}
+            new_fitnesses = np.zeros(self.size)
+            for (key, col) in self.genes.items():
+                new_genes[key] = np.empty_like(col)
+                new_genes[key][:children_amt] = children[key]
+                if self.elitism_rate:
+                    new_genes[key][children_amt:] = col[elites]
+            if self.elitism_rate:
+                new_fitnesses[children_amt:] = fitnesses[elites]
+
+            # The children and elites constitute our new generation
+            self.genes = new_genes
+            self.fitnesses = new_fitnesses
+
+            # Select mutators among the children
+            mutators = np.zeros(self.size, dtype = bool)
+            mutators[:children_amt] = np.less(
+                self.rng.random(children_amt), self.mutation_rate)
 
             self.logger.debug("Mutation pool, of size {}:"\
-                .format(children[mutators].size))
-            self.logger.debug(np.array([child.get_genome() for child in
-                children[mutators]]))
+                .format(np.count_nonzero(mutators)))
+            self.logger.debug(self.get_genomes(np.flatnonzero(mutators)))
             self.logger.debug("Mutating...")
 
             # Mutate the children
-            for mutator in children[mutators]:
-                mutator.mutate(mutation_factor = self.mutation_factor)
-
-            # The children constitutes our new generation
-            if self.elitism_rate:
-                self.population = np.append(children, elites)
-            else:
-                self.population = children
+            self.mutate(mutators, mutation_factor = self.mutation_factor)
             
             self.logger.debug("New population, of size {}:"\
-                .format(self.population.size))
+                .format(self.size))
             self.logger.debug(self.get_genomes())
             self.logger.debug("Mean fitness: {}".format(np.mean(fitnesses)))
             self.logger.debug("Std fitness: {}".format(np.std(fitnesses)))
@@ -505,13 +800,6 @@ class Population():
                 .format(self.fittest.fitness))
             self.logger.info(self.fittest.get_genome())
 
-        gen_iter.close()
-
-        if self.progress_bars >= 2:
-            print("")
-
-        return history
-
 class History():
     ''' History of a population's evolution.
         
@@ -522,18 +810,28 @@ class History():
                         population can look back to avoid redundant
                         fitness computations, where 'inf' means unlimited
                         memory.
+        (bool) keep_genome_history = False: whether to store the genomes
+               of every generation, and not just the fitness values
     '''
 
-    def __init__(self, population, generations, memory = 'inf'):
+    def __init__(self, population, generations, memory = 'inf',
+        keep_genome_history = False):
 
         if memory == 'inf' or memory > generations:
             self.memory = min(int(1e5), generations)
         else:
             self.memory = memory
 
+        # The genomes are stored as one array per gene, with a row for
+        # every generation and a column for every organism
         pop_size = population.size
         self.generations = generations
-        self.genome_history = np.empty((self.memory, pop_size), dict)
+        if keep_genome_history:
+            self.genome_history = {key: np.empty((self.memory, pop_size) + \
+                val.shape[1:], dtype = val.dtype)
+                for (key, val) in population.genus.get_genomes().items()}
+        else:
+            self.genome_history = None
         self.fitness_history = np.empty((self.memory, pop_size), float)
         self.population = population
         self.fittest = {'genome': None, 'fitness': 0}
@@ -546,18 +844,28 @@ class History():
             (int) generation
         '''
 
-        genomes = population.get_genomes()
         fitnesses = population.get_fitnesses()
 
-        if max(fitnesses) > self.fittest['fitness']:
-            self.fittest['genome'] = genomes[np.argmax(fitnesses)]
-            self.fittest['fitness'] = max(fitnesses)
+        fittest_idx = np.argmax(fitnesses)
+        if fitnesses[fittest_idx] > self.fittest['fitness']:
+            self.fittest['genome'] = population.get_genomes([fittest_idx])[0]
+            self.fittest['fitness'] = fitnesses[fittest_idx]
 
-        self.genome_history = np.roll(self.genome_history, 1, axis = 0)
-        self.genome_history[0, :] = genomes
+        # The generations are stored in chronological order, so we only
+        # need to shift the entries when the memory is full
+        if generation < self.memory:
+            row = generation
+        else:
+            row = self.memory - 1
+            self.fitness_history[:-1] = self.fitness_history[1:]
+            if self.genome_history is not None:
+                for val in self.genome_history.values():
+                    val[:-1] = val[1:]
 
-        self.fitness_history = np.roll(self.fitness_history, 1, axis = 0)
-        self.fitness_history[0, :] = fitnesses
+        self.fitness_history[row, :] = fitnesses
+        if self.genome_history is not None:
+            for (key, col) in population.genes.items():
+                self.genome_history[key][row] = col
 
         return self
 
@@ -582,7 +890,7 @@ class History():
                             between 0 and 10
         '''
         
-        fits = self.fitness_history[::-1]
+        fits = self.fitness_history
         gens = self.generations
         mem = self.memory
         means = np.mean(fits, axis = 1)
@@ -593,7 +901,7 @@ class History():
             discrete = True
 
         if show_max or only_show_max:
-            maxs = np.array([np.max(fits[x, :]) for x in xs])
+            maxs = np.max(fits, axis = 1)
 
         plt.style.use("ggplot")
         plt.figure()
@@ -86,6 +86,8 @@ class NNs(ns.Population):
         initializer = np.array(['lecun_uniform', 'lecun_normal',
                                 'glorot_uniform', 'glorot_normal',
                                 'he_uniform', 'he_normal']),
+        keep_genome_history = False,
+        seed = None,
         verbose = 0):
 
         self.train_val_sets       = train_val_sets
@@ -116,7 +118,10 @@ class NNs(ns.Population):
         self.hidden_activation    = hidden_activation
         self.batch_size           = batch_size
         self.initializer          = initializer
+        self.keep_genome_history  = keep_genome_history
         self.verbose              = verbose
+        self.rng                  = np.random.default_rng(seed)
+        self.processes            = []
 
         logging.basicConfig(format = '%(levelname)s: %(message)s')
         self.logger = logging.getLogger()
@@ -133,6 +138,7 @@ class NNs(ns.Population):
         # Hard coded values for neural networks
         self.allow_repeats = False
         self.memory = 'inf'
+        self.vectorized_fitness = False
         
         self.genus = NN(
             max_nm_hidden_layers = self.max_nm_hidden_layers,
@@ -157,25 +163,7 @@ class NNs(ns.Population):
 
         # If user has supplied an initial genome then construct a population
         # which is very similar to that
-        if initial_genome:
-
-            # Create a population of organisms all with the initial genome
-            self.population = np.array([
-                ns.Organism(self.genus, **initial_genome)
-                for _ in range(size)
-                ])
-
-            # Mutate 80% of the population
-            rnd = np.random.random(self.population.shape)
-            for (i, org) in enumerate(self.population):
-                if rnd[i] > 0.2:
-                    org.mutate()
-        else:
-            self.population = self.genus.create_organisms(size)
-
-        # We do not have access to fitness values yet, so choose the 'fittest
-        # organism' to just be a random one
-        self.fittest = np.random.choice(self.population)
+        self.populate(initial_genome)
 
     def train_best(self, max_epochs = 1000000, min_change = 1e-4,
         patience = 10, max_training_time = None, file_name = None):